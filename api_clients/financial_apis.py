@@ -2,46 +2,171 @@
 Financial API clients for testing various financial services
 """
 import requests
-from typing import Dict, Any, Optional, List
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional, List, Tuple
+from dataclasses import dataclass
+import asyncio
 import json
+import itertools
+import threading
 import time
-import random
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 -- enables HTTP/2 support in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Shared by every mock response; treat as read-only
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+@dataclass(slots=True)
 class APIResponse:
-    def __init__(self, status_code: int, data: Dict[Any, Any], headers: Dict[str, str], 
-                 response_time: float, success: bool):
-        self.status_code = status_code
-        self.data = data
-        self.headers = headers
-        self.response_time = response_time
-        self.success = success
+    status_code: int
+    data: Dict[Any, Any]
+    headers: Dict[str, str]
+    response_time_ns: int
+    success: bool
+    
+    @property
+    def response_time(self) -> float:
+        """Elapsed time in seconds"""
+        return self.response_time_ns / 1e9
 
 class AlphaVantageClient:
     """Client for Alpha Vantage stock market API"""
     
-    def __init__(self, api_key: str = "demo"):
+    def __init__(self, api_key: str = "demo", pool_size: int = 32):
         self.base_url = "https://www.alphavantage.co/query"
         self.api_key = api_key
+        self.pool_size = pool_size
+        self._async_session = None
+        self._async_loop = None
+        # Keep-alive session so repeated quotes reuse the same TCP/TLS connection;
+        # with httpx + h2 concurrent quotes also share one multiplexed HTTP/2 connection
+        if HTTPX_AVAILABLE:
+            self.session = httpx.Client(
+                http2=HTTP2_AVAILABLE,
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            )
+        else:
+            self.session = requests.Session()
+            self.session.mount("https://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
     
-    def get_stock_price(self, symbol: str) -> APIResponse:
-        """Get current stock price"""
-        start_time = time.time()
+    def close(self):
+        """Release pooled connections"""
+        self.session.close()
+    
+    def __enter__(self) -> "AlphaVantageClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _get_async_session(self) -> "httpx.AsyncClient":
+        """Async client for the running event loop; httpx connections can't cross loops"""
+        loop = asyncio.get_running_loop()
+        if self._async_session is None or self._async_loop is not loop:
+            self._async_session = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+            self._async_loop = loop
+        return self._async_session
+    
+    async def aclose(self):
+        """Release the async connection pool; call before the event loop ends"""
+        if self._async_session is not None:
+            await self._async_session.aclose()
+            self._async_session = self._async_loop = None
+    
+    def ping(self) -> bool:
+        """Open a pooled connection with a cheap HEAD request; False if unreachable"""
+        try:
+            self.session.head(self.base_url, timeout=5)
+            return True
+        except Exception:
+            return False
+    
+    async def aping(self) -> bool:
+        """Async variant of ping; warms the connection aget_stock_price will reuse"""
+        if not HTTPX_AVAILABLE:
+            return await asyncio.to_thread(self.ping)
         
-        params = {
+        try:
+            await self._get_async_session().head(self.base_url, timeout=5)
+            return True
+        except Exception:
+            return False
+    
+    def _quote_params(self, symbol: str) -> Dict[str, str]:
+        return {
             "function": "GLOBAL_QUOTE",
             "symbol": symbol,
             "apikey": self.api_key
         }
+    
+    def get_stock_price(self, symbol: str) -> APIResponse:
+        """Get current stock price"""
+        start_time = time.perf_counter_ns()
+        
+        params = self._quote_params(symbol)
+        
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=30)
+            response_time_ns = time.perf_counter_ns() - start_time
+            
+            return APIResponse(
+                status_code=response.status_code,
+                data=_json_loads(response.content),
+                headers=dict(response.headers),
+                response_time_ns=response_time_ns,
+                success=response.status_code == 200
+            )
+        except Exception as e:
+            return APIResponse(
+                status_code=500,
+                data={"error": str(e)},
+                headers={},
+                response_time_ns=time.perf_counter_ns() - start_time,
+                success=False
+            )
+    
+    async def aget_stock_price(self, symbol: str) -> APIResponse:
+        """Async variant of get_stock_price"""
+        if not HTTPX_AVAILABLE:
+            return await asyncio.to_thread(self.get_stock_price, symbol)
+        
+        start_time = time.perf_counter_ns()
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=30)
-            response_time = time.time() - start_time
+            response = await self._get_async_session().get(self.base_url, params=self._quote_params(symbol))
             
             return APIResponse(
                 status_code=response.status_code,
-                data=response.json(),
+                data=_json_loads(response.content),
                 headers=dict(response.headers),
-                response_time=response_time,
+                response_time_ns=time.perf_counter_ns() - start_time,
                 success=response.status_code == 200
             )
         except Exception as e:
@@ -49,9 +174,54 @@ class AlphaVantageClient:
                 status_code=500,
                 data={"error": str(e)},
                 headers={},
-                response_time=time.time() - start_time,
+                response_time_ns=time.perf_counter_ns() - start_time,
                 success=False
             )
+    
+    async def _fetch(self, session: "aiohttp.ClientSession", symbol: str) -> APIResponse:
+        """Fetch a single quote on a shared aiohttp session"""
+        start_time = time.perf_counter_ns()
+        
+        try:
+            async with session.get(self.base_url, params=self._quote_params(symbol),
+                                   timeout=aiohttp.ClientTimeout(total=30)) as response:
+                data = await response.json(loads=_json_loads, content_type=None)
+                
+                return APIResponse(
+                    status_code=response.status,
+                    data=data,
+                    headers=dict(response.headers),
+                    response_time_ns=time.perf_counter_ns() - start_time,
+                    success=response.status == 200
+                )
+        except Exception as e:
+            return APIResponse(
+                status_code=500,
+                data={"error": str(e)},
+                headers={},
+                response_time_ns=time.perf_counter_ns() - start_time,
+                success=False
+            )
+    
+    async def get_stock_prices(self, symbols: List[str]) -> List[APIResponse]:
+        """Get current stock prices for several symbols concurrently"""
+        if HTTPX_AVAILABLE:
+            # Multiplexed over the httpx async client; one opened just for this call
+            # (no session yet on this loop) is closed again before returning
+            owned = self._async_session is None or self._async_loop is not asyncio.get_running_loop()
+            self._get_async_session()
+            try:
+                return list(await asyncio.gather(*(self.aget_stock_price(symbol) for symbol in symbols)))
+            finally:
+                if owned:
+                    await self.aclose()
+        
+        if not AIOHTTP_AVAILABLE:
+            # Worker threads over the sync session
+            return list(await asyncio.gather(*(self.aget_stock_price(symbol) for symbol in symbols)))
+        
+        async with aiohttp.ClientSession() as session:
+            return list(await asyncio.gather(*(self._fetch(session, symbol) for symbol in symbols)))
 
 class MockBankingAPI:
     """Mock banking API for testing financial transactions"""
@@ -60,6 +230,22 @@ class MockBankingAPI:
         self.base_url = "http://localhost:8000"  # Mock server
         self.accounts = self._generate_mock_accounts()
         self.transactions = []
+        # Hash indexes so lookups don't scan the account/transaction lists
+        self._accounts_by_id = {acc["account_id"]: acc for acc in self.accounts}
+        self._txn_by_account: Dict[str, List[Dict]] = {}
+        # Sequential IDs never collide, unlike random 6-digit ones
+        self._txn_counter = itertools.count(1)
+        # One instance may be shared by concurrent test workers
+        self._transfer_lock = threading.Lock()
+    
+    def _error_response(self, status_code: int, message: str, start_time: int) -> APIResponse:
+        return APIResponse(
+            status_code=status_code,
+            data={"error": message},
+            headers=_JSON_HEADERS,
+            response_time_ns=time.perf_counter_ns() - start_time,
+            success=False
+        )
     
     def _generate_mock_accounts(self) -> List[Dict]:
         """Generate mock bank accounts"""
@@ -84,9 +270,9 @@ class MockBankingAPI:
     
     def get_account_balance(self, account_id: str) -> APIResponse:
         """Get account balance"""
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         
-        account = next((acc for acc in self.accounts if acc["account_id"] == account_id), None)
+        account = self._accounts_by_id.get(account_id)
         
         if account:
             return APIResponse(
@@ -97,87 +283,79 @@ class MockBankingAPI:
                     "currency": account["currency"],
                     "timestamp": time.time()
                 },
-                headers={"Content-Type": "application/json"},
-                response_time=time.time() - start_time,
+                headers=_JSON_HEADERS,
+                response_time_ns=time.perf_counter_ns() - start_time,
                 success=True
             )
         else:
-            return APIResponse(
-                status_code=404,
-                data={"error": "Account not found"},
-                headers={"Content-Type": "application/json"},
-                response_time=time.time() - start_time,
-                success=False
-            )
+            return self._error_response(404, "Account not found", start_time)
     
     def transfer_funds(self, from_account: str, to_account: str, amount: float) -> APIResponse:
         """Transfer funds between accounts"""
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         
         # Validate accounts exist
-        from_acc = next((acc for acc in self.accounts if acc["account_id"] == from_account), None)
-        to_acc = next((acc for acc in self.accounts if acc["account_id"] == to_account), None)
+        from_acc = self._accounts_by_id.get(from_account)
+        to_acc = self._accounts_by_id.get(to_account)
         
         if not from_acc:
-            return APIResponse(
-                status_code=404,
-                data={"error": "Source account not found"},
-                headers={"Content-Type": "application/json"},
-                response_time=time.time() - start_time,
-                success=False
-            )
+            return self._error_response(404, "Source account not found", start_time)
         
         if not to_acc:
-            return APIResponse(
-                status_code=404,
-                data={"error": "Destination account not found"},
-                headers={"Content-Type": "application/json"},
-                response_time=time.time() - start_time,
-                success=False
-            )
+            return self._error_response(404, "Destination account not found", start_time)
         
-        # Check sufficient balance
-        if from_acc["balance"] < amount:
-            return APIResponse(
-                status_code=400,
-                data={"error": "Insufficient funds"},
-                headers={"Content-Type": "application/json"},
-                response_time=time.time() - start_time,
-                success=False
-            )
-        
-        # Perform transfer
-        from_acc["balance"] -= amount
-        to_acc["balance"] += amount
-        
-        transaction_id = f"TXN{random.randint(100000, 999999)}"
-        transaction = {
-            "transaction_id": transaction_id,
-            "from_account": from_account,
-            "to_account": to_account,
-            "amount": amount,
-            "status": "completed",
-            "timestamp": time.time()
-        }
-        
-        self.transactions.append(transaction)
+        with self._transfer_lock:
+            # Check sufficient balance
+            if from_acc["balance"] < amount:
+                return self._error_response(400, "Insufficient funds", start_time)
+            
+            # Perform transfer
+            from_acc["balance"] -= amount
+            to_acc["balance"] += amount
+            
+            transaction_id = f"TXN{next(self._txn_counter):08d}"
+            transaction = {
+                "transaction_id": transaction_id,
+                "from_account": from_account,
+                "to_account": to_account,
+                "amount": amount,
+                "status": "completed",
+                "timestamp": time.time()
+            }
+            
+            self.transactions.append(transaction)
+            self._txn_by_account.setdefault(from_account, []).append(transaction)
+            if to_account != from_account:
+                self._txn_by_account.setdefault(to_account, []).append(transaction)
         
         return APIResponse(
             status_code=200,
             data=transaction,
-            headers={"Content-Type": "application/json"},
-            response_time=time.time() - start_time,
+            headers=_JSON_HEADERS,
+            response_time_ns=time.perf_counter_ns() - start_time,
             success=True
         )
     
+    def ping(self) -> bool:
+        """In-memory mock; there is no connection to warm"""
+        return True
+    
+    async def aping(self) -> bool:
+        return True
+    
+    async def aget_account_balance(self, account_id: str) -> APIResponse:
+        """Async variant of get_account_balance (in-memory, never blocks)"""
+        return self.get_account_balance(account_id)
+    
+    async def atransfer_funds(self, from_account: str, to_account: str, amount: float) -> APIResponse:
+        """Async variant of transfer_funds (in-memory, never blocks)"""
+        return self.transfer_funds(from_account, to_account, amount)
+    
     def get_transaction_history(self, account_id: str, limit: int = 10) -> APIResponse:
         """Get transaction history for account"""
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         
-        account_transactions = [
-            txn for txn in self.transactions 
-            if txn["from_account"] == account_id or txn["to_account"] == account_id
-        ]
+        account_transactions = self._txn_by_account.get(account_id, [])
         
         return APIResponse(
             status_code=200,
@@ -186,8 +364,8 @@ class MockBankingAPI:
                 "transactions": account_transactions[-limit:],
                 "total_count": len(account_transactions)
             },
-            headers={"Content-Type": "application/json"},
-            response_time=time.time() - start_time,
+            headers=_JSON_HEADERS,
+            response_time_ns=time.perf_counter_ns() - start_time,
             success=True
         )
 
@@ -204,27 +382,35 @@ class CurrencyExchangeClient:
             "JPY": 110.0,
             "CAD": 1.25
         }
+        # Rates are static, so resolve every pair once up front: rates[from][to]
+        self._rate_matrix = {
+            from_currency: {
+                to_currency: round(to_rate / from_rate, 4)
+                for to_currency, to_rate in self.mock_rates.items()
+            }
+            for from_currency, from_rate in self.mock_rates.items()
+        }
+    
+    def _lookup_rate(self, from_currency: str, to_currency: str) -> Optional[float]:
+        return self._rate_matrix.get(from_currency, {}).get(to_currency)
     
     def get_exchange_rate(self, from_currency: str, to_currency: str) -> APIResponse:
         """Get exchange rate between currencies"""
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         
-        if from_currency in self.mock_rates and to_currency in self.mock_rates:
-            # Calculate rate via USD
-            from_rate = self.mock_rates[from_currency]
-            to_rate = self.mock_rates[to_currency]
-            exchange_rate = to_rate / from_rate
-            
+        rate = self._lookup_rate(from_currency, to_currency)
+        
+        if rate is not None:
             return APIResponse(
                 status_code=200,
                 data={
                     "from": from_currency,
                     "to": to_currency,
-                    "rate": round(exchange_rate, 4),
+                    "rate": rate,
                     "timestamp": time.time()
                 },
                 headers={"Content-Type": "application/json"},
-                response_time=time.time() - start_time,
+                response_time_ns=time.perf_counter_ns() - start_time,
                 success=True
             )
         else:
@@ -232,6 +418,46 @@ class CurrencyExchangeClient:
                 status_code=400,
                 data={"error": "Unsupported currency"},
                 headers={"Content-Type": "application/json"},
-                response_time=time.time() - start_time,
+                response_time_ns=time.perf_counter_ns() - start_time,
                 success=False
-            )
\ No newline at end of file
+            )
+    
+    def ping(self) -> bool:
+        """In-memory mock; there is no connection to warm"""
+        return True
+    
+    async def aping(self) -> bool:
+        return True
+    
+    async def aget_exchange_rate(self, from_currency: str, to_currency: str) -> APIResponse:
+        """Async variant of get_exchange_rate (mock table, never blocks)"""
+        return self.get_exchange_rate(from_currency, to_currency)
+    
+    def get_exchange_rates_bulk(self, pairs: List[Tuple[str, str]]) -> APIResponse:
+        """Get exchange rates for many currency pairs in one call"""
+        start_time = time.perf_counter_ns()
+        
+        rates = [
+            {"from": from_currency, "to": to_currency, "rate": self._lookup_rate(from_currency, to_currency)}
+            for from_currency, to_currency in pairs
+        ]
+        
+        if any(entry["rate"] is None for entry in rates):
+            return APIResponse(
+                status_code=400,
+                data={"error": "Unsupported currency"},
+                headers={"Content-Type": "application/json"},
+                response_time_ns=time.perf_counter_ns() - start_time,
+                success=False
+            )
+        
+        return APIResponse(
+            status_code=200,
+            data={
+                "rates": rates,
+                "timestamp": time.time()
+            },
+            headers={"Content-Type": "application/json"},
+            response_time_ns=time.perf_counter_ns() - start_time,
+            success=True
+        )
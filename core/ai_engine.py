@@ -2,138 +2,416 @@
 AI Engine for intelligent test generation and analysis
 """
 try:
-    import openai
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
     
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union, Callable, Tuple
+from dataclasses import dataclass, asdict, is_dataclass
+import hashlib
 import json
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+from core.cache import JSONFileCache, SemanticCache
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+COMPLETION_MODEL = "gpt-3.5-turbo-instruct"
+
+# Prompt skeletons are built once; only the variable parts are filled per call
+_TEST_CASES_PROMPT = """
+As an expert financial software tester, generate comprehensive test cases for this API:
+
+API Specification: {api_spec}
+Context: {context}
+
+Generate test cases covering:
+1. Happy path scenarios
+2. Edge cases and boundary conditions
+3. Error handling
+4. Security vulnerabilities
+5. Performance considerations
+6. Financial compliance scenarios
+
+Return a JSON array of test cases.
+"""
+
+_ANALYSIS_PROMPT = """
+Analyze these test results and provide insights:
+
+Results: {results}
+
+Provide analysis including:
+1. Overall test health
+2. Failure patterns
+3. Risk assessment
+4. Recommendations for improvement
+5. Potential issues to investigate
+"""
+
+_TEST_DATA_PROMPT = """
+Generate {count} realistic {data_type} test data samples for financial testing.
+
+For example, if data_type is "bank_transaction", generate realistic bank transactions.
+If it's "credit_card", generate realistic credit card data (use fake numbers).
+
+Return as JSON array with realistic but fake data suitable for testing.
+"""
+
+_ENV_LOADED = False
+_FAKER = None
+
+def _load_env_once():
+    """Load .env on first engine construction rather than at import time"""
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _ENV_LOADED = True
+
+def _faker():
+    """Shared Faker instance; constructing one loads every provider"""
+    global _FAKER
+    if _FAKER is None:
+        from faker import Faker
+        _FAKER = Faker()
+    return _FAKER
+
+def _to_json(data: Any) -> str:
+    """Serialize data as indented JSON for prompts"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, indent=2, default=_dataclass_to_dict)
+
+def _dataclass_to_dict(value: Any) -> Dict:
+    """json.dumps hook for dataclass records such as TestResult; orjson handles them natively"""
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _from_json(text: str) -> Any:
+    """Deserialize JSON text returned by the model"""
+    return orjson.loads(text) if ORJSON_AVAILABLE else json.loads(text)
+
+def _as_json_text(data: Any) -> str:
+    """Prompt text for data; pre-serialized JSON bytes are used as-is"""
+    if isinstance(data, (bytes, bytearray)):
+        return data.decode()
+    return _to_json(data)
+
+def _as_object(data: Any) -> Any:
+    """Inverse of _as_json_text for the mock fallbacks"""
+    if isinstance(data, (bytes, bytearray)):
+        return _from_json(data)
+    return data
+
+def _find_json_array(text: str) -> Optional[str]:
+    """Return the first balanced top-level JSON array in text, in a single pass"""
+    start = text.find("[")
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "[{":
+            depth += 1
+        elif char in "]}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    
+    return None
+
+def _random_amounts(fake, low: float, high: float, count: int) -> List[float]:
+    """Draw count currency amounts rounded to cents in one batch"""
+    if NUMPY_AVAILABLE:
+        # Seed from Faker's RNG so Faker.seed() still makes runs reproducible
+        rng = np.random.default_rng(fake.random.getrandbits(64))
+        return np.round(rng.uniform(low, high, size=count), 2).tolist()
+    return [round(fake.random.uniform(low, high), 2) for _ in range(count)]
+
+@dataclass(slots=True)
 class TestCase:
-    def __init__(self, name: str, description: str, test_type: str, priority: str, 
-                 steps: List[str], expected_result: str, api_endpoint: Optional[str] = None, 
-                 test_data: Optional[Dict] = None):
-        self.name = name
-        self.description = description
-        self.test_type = test_type
-        self.priority = priority
-        self.steps = steps
-        self.expected_result = expected_result
-        self.api_endpoint = api_endpoint
-        self.test_data = test_data
+    name: str
+    description: str
+    test_type: str
+    priority: str
+    steps: List[str]
+    expected_result: str
+    api_endpoint: Optional[str] = None
+    test_data: Optional[Dict] = None
+
+@dataclass(slots=True)
+class TestResult:
+    __test__ = False  # not a pytest test class despite the name
+    
+    test_name: str
+    test_type: str
+    priority: str
+    status: str
+    message: str
+    api_endpoint: Optional[str] = None
+    response_time: float = 0
+    ts_offset_ns: int = 0
+    cached: bool = False
 
 class AITestEngine:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache_dir: Optional[str] = "./.ai_cache",
+                 cache_ttl: Optional[float] = 7 * 24 * 3600,
+                 embedder: Optional[Callable[[List[str]], Any]] = None):
+        self._client = None
+        self._async_client = None
+        self._cache = None
+        self._semantic_cache = None
+        self._cache_ttl = cache_ttl
+        _load_env_once()
+        
         if OPENAI_AVAILABLE:
-            # For older OpenAI versions
-            openai.api_key = api_key or os.getenv("OPENAI_API_KEY")
+            api_key = api_key or os.getenv("OPENAI_API_KEY")
+            try:
+                self._client = OpenAI(api_key=api_key)
+                self._async_client = AsyncOpenAI(api_key=api_key)
+            except Exception as e:
+                self._client = self._async_client = None
+                print(f"OpenAI client unavailable ({e}). Using mock AI responses.")
         else:
             print("OpenAI not available. Using mock AI responses.")
-    
-    def generate_test_cases(self, api_spec: Dict, context: str = "") -> List[TestCase]:
-        """Generate test cases using AI based on API specification"""
-        if not OPENAI_AVAILABLE:
-            return self._generate_mock_test_cases(api_spec)
         
-        prompt = f"""
-        As an expert financial software tester, generate comprehensive test cases for this API:
-        
-        API Specification: {json.dumps(api_spec, indent=2)}
-        Context: {context}
+        # Completions are cached on disk so re-runs with unchanged inputs skip the API
+        if self._client is not None and cache_dir:
+            if DISKCACHE_AVAILABLE:
+                self._cache = diskcache.Cache(cache_dir)
+            else:
+                # Own subdirectory: its expiry sweep must not touch the semantic cache file
+                self._cache = JSONFileCache(os.path.join(cache_dir, "completions"), ttl=cache_ttl)
+            self._cache.expire()
+            
+            # Near-duplicate specs (renamed, reworded) reuse an earlier generation
+            if embedder is not None and NUMPY_AVAILABLE:
+                self._semantic_cache = SemanticCache(os.path.join(cache_dir, "semantic_cache.json"), embedder)
+    
+    def _cache_key(self, *parts: Any) -> str:
+        """Content hash of everything that determines a completion"""
+        payload = json.dumps(parts, sort_keys=True, default=str).encode()
+        return hashlib.blake2b(payload, digest_size=32).hexdigest()
+    
+    def _cache_get(self, key: str) -> Any:
+        return self._cache.get(key) if self._cache is not None else None
+    
+    def _cache_set(self, key: Optional[str], value: Any):
+        if self._cache is not None and key is not None:
+            self._cache.set(key, value, expire=self._cache_ttl)
+    
+    def _test_case_keys(self, api_spec: Union[Dict, bytes],
+                        context: str) -> Tuple[str, str, Tuple[str, Optional[str]]]:
+        """Prompt text, exact cache key and semantic cache (text, api type) for one spec"""
+        spec_text = _as_json_text(api_spec)
+        # Dict specs are keyed canonically (sorted keys) so reordered specs share an entry
+        spec_key = api_spec if isinstance(api_spec, dict) else spec_text
+        cache_key = self._cache_key("test_cases", spec_key, context, COMPLETION_MODEL, 0.7)
         
-        Generate test cases covering:
-        1. Happy path scenarios
-        2. Edge cases and boundary conditions
-        3. Error handling
-        4. Security vulnerabilities
-        5. Performance considerations
-        6. Financial compliance scenarios
+        # The API type picks the test handlers, so near-duplicates must share it exactly
+        try:
+            spec = _as_object(api_spec)
+        except ValueError:
+            spec = None
+        api_type = spec.get("type") if isinstance(spec, dict) else None
+        return spec_text, cache_key, (f"{context}\n{spec_text}", api_type)
+    
+    def _cached_test_cases(self, cache_key: str,
+                           semantic_key: Tuple[str, Optional[str]]) -> Optional[List[TestCase]]:
+        """Exact content-hash hit first, then a near-duplicate spec hit"""
+        cached = self._cache_get(cache_key)
+        if cached is None and self._semantic_cache is not None:
+            cached = self._semantic_cache.get(*semantic_key)
+        return [TestCase(**tc) for tc in cached] if cached is not None else None
+    
+    def generate_test_cases(self, api_spec: Union[Dict, bytes], context: str = "") -> List[TestCase]:
+        """Generate test cases using AI based on API specification
         
-        Return a JSON array of test cases.
+        api_spec may be passed as already-serialized JSON bytes to skip
+        re-serializing it when the same spec feeds many calls.
         """
+        if self._client is None:
+            return self._generate_mock_test_cases(api_spec)
+        
+        spec_text, cache_key, semantic_key = self._test_case_keys(api_spec, context)
+        cached = self._cached_test_cases(cache_key, semantic_key)
+        if cached is not None:
+            return cached
         
         try:
-            response = openai.Completion.create(
-                engine="gpt-3.5-turbo-instruct",
-                prompt=prompt,
+            response = self._client.completions.create(
+                model=COMPLETION_MODEL,
+                prompt=_TEST_CASES_PROMPT.format(api_spec=spec_text, context=context),
                 max_tokens=2000,
                 temperature=0.7
             )
             
             # Parse response and create test cases
-            return self._parse_ai_response(response.choices[0].text, api_spec)
+            return self._parse_ai_response(response.choices[0].text, api_spec, cache_key, semantic_key)
         except Exception as e:
             print(f"AI generation failed: {e}")
             return self._generate_mock_test_cases(api_spec)
     
-    def analyze_test_results(self, results: List[Dict]) -> Dict[str, Any]:
-        """Use AI to analyze test results and identify patterns"""
-        if not OPENAI_AVAILABLE:
-            return self._generate_mock_analysis(results)
+    async def agenerate_test_cases(self, api_spec: Union[Dict, bytes], context: str = "") -> List[TestCase]:
+        """Async variant of generate_test_cases for use on an event loop"""
+        if self._async_client is None:
+            return self._generate_mock_test_cases(api_spec)
         
-        prompt = f"""
-        Analyze these test results and provide insights:
+        spec_text, cache_key, semantic_key = self._test_case_keys(api_spec, context)
+        cached = self._cached_test_cases(cache_key, semantic_key)
+        if cached is not None:
+            return cached
         
-        Results: {json.dumps(results, indent=2)}
+        return await self._acomplete_test_cases(api_spec, context, spec_text, cache_key, semantic_key)
+    
+    async def _acomplete_test_cases(self, api_spec: Union[Dict, bytes], context: str, spec_text: str,
+                                    cache_key: str, semantic_key: Tuple[str, Optional[str]]) -> List[TestCase]:
+        """Ask the model for test cases, bypassing the cache lookup"""
+        try:
+            response = await self._async_client.completions.create(
+                model=COMPLETION_MODEL,
+                prompt=_TEST_CASES_PROMPT.format(api_spec=spec_text, context=context),
+                max_tokens=2000,
+                temperature=0.7
+            )
+            
+            return self._parse_ai_response(response.choices[0].text, api_spec, cache_key, semantic_key)
+        except Exception as e:
+            print(f"AI generation failed: {e}")
+            return self._generate_mock_test_cases(api_spec)
+    
+    async def generate_test_cases_batch(self, api_specs: List[Union[Dict, bytes]], context: str = "") -> List[List[TestCase]]:
+        """Generate test cases for several API specs in one batch
         
-        Provide analysis including:
-        1. Overall test health
-        2. Failure patterns
-        3. Risk assessment
-        4. Recommendations for improvement
-        5. Potential issues to investigate
+        Cache lookups for the whole batch happen up front, with a single
+        embedding call for the semantic cache; the misses go to the model as
+        one completions request with a prompt per spec. max_tokens applies
+        to each prompt, so specs don't compete for one answer's budget.
         """
+        if self._async_client is None:
+            return [self._generate_mock_test_cases(api_spec) for api_spec in api_specs]
+        
+        keys = [self._test_case_keys(api_spec, context) for api_spec in api_specs]
+        found = [self._cache_get(cache_key) for _, cache_key, _ in keys]
+        
+        misses = [i for i, cached in enumerate(found) if cached is None]
+        if misses and self._semantic_cache is not None:
+            hits = self._semantic_cache.get_many([keys[i][2][0] for i in misses],
+                                                 [keys[i][2][1] for i in misses])
+            for i, hit in zip(misses, hits):
+                found[i] = hit
+        
+        results: List[Optional[List[TestCase]]] = [
+            [TestCase(**tc) for tc in cached] if cached is not None else None for cached in found
+        ]
+        misses = [i for i, test_cases in enumerate(results) if test_cases is None]
+        if not misses:
+            return results
         
         try:
-            if OPENAI_AVAILABLE:
-                response = openai.Completion.create(
-                    engine="gpt-3.5-turbo-instruct",
-                    prompt=prompt,
-                    max_tokens=1000,
-                    temperature=0.3
-                )
-                return {"analysis": response.choices[0].text.strip()}
+            response = await self._async_client.completions.create(
+                model=COMPLETION_MODEL,
+                prompt=[_TEST_CASES_PROMPT.format(api_spec=keys[i][0], context=context) for i in misses],
+                max_tokens=2000,
+                temperature=0.7
+            )
+            # choice.index is the position of its prompt in the request
+            texts = {choice.index: choice.text for choice in response.choices}
+        except Exception as e:
+            print(f"AI generation failed: {e}")
+            texts = {}
+        
+        for position, i in enumerate(misses):
+            if position in texts:
+                results[i] = self._parse_ai_response(texts[position], api_specs[i], keys[i][1], keys[i][2])
             else:
-                return self._generate_mock_analysis(results)
+                results[i] = self._generate_mock_test_cases(api_specs[i])
+        
+        return results
+    
+    def analyze_test_results(self, results: Union[List[Dict], List[TestResult], bytes]) -> Dict[str, Any]:
+        """Use AI to analyze test results and identify patterns
+        
+        results may be passed as already-serialized JSON bytes.
+        """
+        if self._client is None:
+            return self._generate_mock_analysis(results)
+        
+        # Not cached: results carry per-run timings, so the same key never comes back
+        results_text = _as_json_text(results)
+        prompt = _ANALYSIS_PROMPT.format(results=results_text)
+        
+        try:
+            response = self._client.completions.create(
+                model=COMPLETION_MODEL,
+                prompt=prompt,
+                max_tokens=1000,
+                temperature=0.3
+            )
+            return {"analysis": response.choices[0].text.strip()}
         except Exception as e:
             return {"error": f"Analysis failed: {e}"}
     
     def generate_test_data(self, data_type: str, count: int = 10) -> List[Dict]:
         """Generate realistic test data for financial scenarios"""
-        if not OPENAI_AVAILABLE:
+        if self._client is None:
             return self._generate_mock_test_data(data_type, count)
         
-        prompt = f"""
-        Generate {count} realistic {data_type} test data samples for financial testing.
+        cache_key = self._cache_key("test_data", data_type, count, COMPLETION_MODEL, 0.8)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
         
-        For example, if data_type is "bank_transaction", generate realistic bank transactions.
-        If it's "credit_card", generate realistic credit card data (use fake numbers).
-        
-        Return as JSON array with realistic but fake data suitable for testing.
-        """
+        prompt = _TEST_DATA_PROMPT.format(count=count, data_type=data_type)
         
         try:
-            if OPENAI_AVAILABLE:
-                response = openai.Completion.create(
-                    engine="gpt-3.5-turbo-instruct",
-                    prompt=prompt,
-                    max_tokens=1000,
-                    temperature=0.8
-                )
-                return json.loads(response.choices[0].text.strip())
-            else:
-                return self._generate_mock_test_data(data_type, count)
+            response = self._client.completions.create(
+                model=COMPLETION_MODEL,
+                prompt=prompt,
+                max_tokens=1000,
+                temperature=0.8
+            )
+            test_data = _from_json(response.choices[0].text.strip())
+            self._cache_set(cache_key, test_data)
+            return test_data
         except Exception as e:
             print(f"Test data generation failed: {e}")
             return self._generate_mock_test_data(data_type, count)
     
-    def _generate_mock_test_cases(self, api_spec: Dict) -> List[TestCase]:
+    def _generate_mock_test_cases(self, api_spec: Union[Dict, bytes]) -> List[TestCase]:
         """Generate mock test cases when AI is not available"""
+        api_spec = _as_object(api_spec)
         api_name = api_spec.get("name", "Unknown API")
         api_type = api_spec.get("type", "unknown")
         
@@ -172,10 +450,14 @@ class AITestEngine:
         
         return mock_cases
     
-    def _generate_mock_analysis(self, results: List[Dict]) -> Dict[str, Any]:
+    def _generate_mock_analysis(self, results: Union[List[Dict], List[TestResult], bytes]) -> Dict[str, Any]:
         """Generate mock analysis when AI is not available"""
+        results = _as_object(results)
         total_tests = len(results)
-        passed_tests = len([r for r in results if r.get("status") == "passed"])
+        passed_tests = sum(
+            1 for r in results
+            if (r.get("status") if isinstance(r, dict) else r.status) == "passed"
+        )
         failed_tests = total_tests - passed_tests
         
         return {
@@ -193,19 +475,18 @@ class AITestEngine:
     
     def _generate_mock_test_data(self, data_type: str, count: int) -> List[Dict]:
         """Generate mock test data when AI is not available"""
-        from faker import Faker
-        fake = Faker()
+        fake = _faker()
         
         if data_type == "bank_transaction":
             return [
                 {
                     "transaction_id": fake.uuid4(),
-                    "amount": round(fake.random.uniform(10.0, 10000.0), 2),
+                    "amount": amount,
                     "from_account": fake.iban(),
                     "to_account": fake.iban(),
                     "description": fake.sentence(),
                     "timestamp": fake.date_time().isoformat()
-                } for _ in range(count)
+                } for amount in _random_amounts(fake, 10.0, 10000.0, count)
             ]
         elif data_type == "credit_card":
             return [
@@ -214,21 +495,26 @@ class AITestEngine:
                     "expiry_date": fake.credit_card_expire(),
                     "cvv": fake.credit_card_security_code(),
                     "cardholder_name": fake.name(),
-                    "credit_limit": round(fake.random.uniform(1000.0, 50000.0), 2)
-                } for _ in range(count)
+                    "credit_limit": credit_limit
+                } for credit_limit in _random_amounts(fake, 1000.0, 50000.0, count)
             ]
         else:
             return [{"id": i, "data": fake.sentence()} for i in range(count)]
     
-    def _parse_ai_response(self, response_text: str, api_spec: Dict) -> List[TestCase]:
+    def _parse_ai_response(self, response_text: str, api_spec: Union[Dict, bytes],
+                           cache_key: Optional[str] = None,
+                           semantic_key: Optional[Tuple[str, Optional[str]]] = None) -> List[TestCase]:
         """Parse AI response into TestCase objects"""
         try:
             # Try to extract JSON from response
-            import re
-            json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-            if json_match:
-                test_cases_data = json.loads(json_match.group(0))
-                return [TestCase(**tc) for tc in test_cases_data if isinstance(tc, dict)]
+            json_array = _find_json_array(response_text)
+            if json_array:
+                test_cases_data = [tc for tc in _from_json(json_array) if isinstance(tc, dict)]
+                test_cases = [TestCase(**tc) for tc in test_cases_data]
+                self._cache_set(cache_key, test_cases_data)
+                if self._semantic_cache is not None and semantic_key is not None:
+                    self._semantic_cache.set(semantic_key[0], test_cases_data, semantic_key[1])
+                return test_cases
         except:
             pass
         
@@ -0,0 +1,154 @@
+"""
+Persistent caches for AI-generated test artifacts
+"""
+from typing import Any, Callable, List, Optional
+from pathlib import Path
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+def _read_json(path: Path) -> Any:
+    with open(path, "rb") as f:
+        data = f.read()
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def _write_json_atomic(path: Path, value: Any, mtime: Optional[float] = None):
+    """Write via a temp file and rename so concurrent readers never see partial files"""
+    data = orjson.dumps(value) if ORJSON_AVAILABLE else json.dumps(value).encode()
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if mtime is not None:
+            os.utime(tmp_path, (mtime, mtime))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class JSONFileCache:
+    """File-per-key JSON cache with expiry, used when diskcache is not installed
+    
+    Each file's modification time is set to its expiry deadline, so expired
+    entries can be found and swept without reading them.
+    """
+
+    # Deadline offset for entries stored without any expiry
+    _NO_EXPIRY = 100 * 365 * 24 * 3600.0
+
+    def __init__(self, directory: str, ttl: Optional[float] = None):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value, or default if missing, expired or unreadable"""
+        path = self._path(key)
+        try:
+            if path.stat().st_mtime < time.time():
+                path.unlink()
+                return default
+            return _read_json(path)
+        except (OSError, ValueError):
+            return default
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None):
+        """Store value under key for expire seconds (default: the cache's ttl)"""
+        if expire is None:
+            expire = self.ttl if self.ttl is not None else self._NO_EXPIRY
+        _write_json_atomic(self._path(key), value, mtime=time.time() + expire)
+
+    def expire(self) -> int:
+        """Delete expired entries and return how many were removed, like diskcache's Cache.expire"""
+        now = time.time()
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            try:
+                if path.stat().st_mtime < now:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+class SemanticCache:
+    """Reuses values across near-duplicate texts by cosine similarity
+    
+    Texts are embedded with the supplied embed function (one L2-normalized
+    row per text). An optional group (such as the API type) must match
+    exactly for an entry to be reused. A lookup scores the query against every stored embedding
+    with one matrix product; the cache holds at most max_entries texts, so an
+    exhaustive scan is cheap and, unlike bucketed LSH, never misses a
+    neighbour above the threshold. Requires NumPy.
+    """
+
+    def __init__(self, path: str, embed: Callable[[List[str]], Any],
+                 threshold: float = 0.95, max_entries: int = 1024):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: List[list] = self._load()
+        self._matrix = None
+        self._groups = None
+
+    def _load(self) -> List[list]:
+        try:
+            return _read_json(self.path)[-self.max_entries:]
+        except (OSError, ValueError):
+            return []
+
+    def _lookup_many(self, embeddings, groups: List[Optional[str]]) -> List[Any]:
+        with self._lock:
+            if not self._entries:
+                return [None] * len(embeddings)
+            if self._matrix is None:
+                self._matrix = np.array([embedding for embedding, _, _ in self._entries])
+                self._groups = np.array([group for _, _, group in self._entries], dtype=object)
+            scores = np.asarray(embeddings) @ self._matrix.T
+            # Only entries of the query's own group are candidates, however similar the text
+            scores[self._groups[None, :] != np.array(groups, dtype=object)[:, None]] = -np.inf
+            best = scores.argmax(axis=1)
+            return [
+                self._entries[j][1] if scores[i, j] >= self.threshold else None
+                for i, j in enumerate(best)
+            ]
+
+    def get(self, text: str, group: Optional[str] = None) -> Any:
+        """Return the value stored for a text of the same group within threshold
+        cosine similarity, else None"""
+        return self._lookup_many(self.embed([text]), [group])[0]
+
+    def get_many(self, texts: List[str], groups: Optional[List[Optional[str]]] = None) -> List[Any]:
+        """Batch form of get; embeds and scores every text in one call"""
+        if not texts:
+            return []
+        return self._lookup_many(self.embed(texts), groups if groups is not None else [None] * len(texts))
+
+    def set(self, text: str, value: Any, group: Optional[str] = None):
+        """Store value for text under group, evicting the oldest entries beyond max_entries"""
+        embedding = self.embed([text])[0]
+        with self._lock:
+            self._entries.append([embedding.tolist(), value, group])
+            del self._entries[:-self.max_entries]
+            self._matrix = None
+            _write_json_atomic(self.path, self._entries)
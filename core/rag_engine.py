@@ -2,30 +2,151 @@
 RAG (Retrieval-Augmented Generation) engine for intelligent test generation
 using financial domain knowledge - Simplified version for compatibility
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, FrozenSet, Optional
+from concurrent.futures import ProcessPoolExecutor
 import os
 import json
 import re
-from dotenv import load_dotenv
+import zlib
 
-load_dotenv()
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from scipy.sparse import vstack
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+    from sklearn.pipeline import make_pipeline
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+_WORD_RE = re.compile(r"\w+")
+_COMPLIANCE_KEYWORDS = frozenset(["pci", "aml", "gdpr", "transaction", "compliance", "security"])
+
+# (api type keywords, scenario templates) checked in order by generate_domain_aware_tests
+_SCENARIO_RULES = (
+    (("banking", "transaction"), (
+        {
+            "name": "{api_name} AML Compliance Test",
+            "description": "Test anti-money laundering transaction monitoring",
+            "priority": "high",
+            "type": "compliance"
+        },
+        {
+            "name": "{api_name} Transaction Integrity Test",
+            "description": "Verify transaction authorization and limits",
+            "priority": "high",
+            "type": "functional"
+        },
+    )),
+    (("payment", "card"), (
+        {
+            "name": "{api_name} PCI DSS Compliance Test",
+            "description": "Test credit card data encryption and protection",
+            "priority": "high",
+            "type": "security"
+        },
+    )),
+)
+
+_GDPR_SCENARIO = {
+    "name": "{api_name} GDPR Data Privacy Test",
+    "description": "Test personal data protection and user rights",
+    "priority": "medium",
+    "type": "compliance"
+}
+
+# Hashed term counts need no shared vocabulary, so document chunks can be vectorized independently
+_HASHING_OPTIONS = {"stop_words": "english", "alternate_sign": False, "norm": None}
+
+def _tokenize_docs(docs: List[str]) -> List[FrozenSet[str]]:
+    """Lowercased word sets per document; module-level so worker processes can run it"""
+    return [frozenset(_WORD_RE.findall(doc.lower())) for doc in docs]
+
+def _hash_docs(docs: List[str]):
+    """Sparse term-count rows per document; module-level so worker processes can run it"""
+    return HashingVectorizer(**_HASHING_OPTIONS).transform(docs)
+
+def _map_chunks(fn: Callable[[List[str]], Any], docs: List[str], n_workers: int) -> List[Any]:
+    """fn applied to n_workers contiguous chunks of docs in worker processes, in order"""
+    if n_workers <= 1 or len(docs) <= 1:
+        return [fn(docs)]
+    chunk_size = -(-len(docs) // n_workers)
+    chunks = [docs[i:i + chunk_size] for i in range(0, len(docs), chunk_size)]
+    with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+        return list(executor.map(fn, chunks))
 
 class FinancialRAGEngine:
     def __init__(self, persist_directory: str = "./chroma_db"):
         self.persist_directory = persist_directory
         self.knowledge_base = FINANCIAL_DOMAIN_DOCS
+        self._indexed_docs: Optional[List[str]] = None
+        self._build_index()
+    
+    def _build_index(self, n_workers: int = 1):
+        """Index the knowledge base once so queries don't rescan document text
+        
+        A no-op when the documents match those already indexed, so reloading
+        the same knowledge base doesn't refit.
+        """
+        docs = self.knowledge_base
+        if docs == self._indexed_docs:
+            return
+        
+        self._doc_tokens = None
+        self._vectorizer = None
+        self._doc_matrix = None
+        
+        if not (SKLEARN_AVAILABLE and docs):
+            # Token sets only back the keyword fallback
+            self._doc_tokens = [tokens for chunk in _map_chunks(_tokenize_docs, docs, n_workers) for tokens in chunk]
+        elif n_workers > 1:
+            # Rows are L2-normalized, so a dot product with the query is cosine similarity
+            transformer = TfidfTransformer()
+            self._doc_matrix = transformer.fit_transform(vstack(_map_chunks(_hash_docs, docs, n_workers)))
+            self._vectorizer = make_pipeline(HashingVectorizer(**_HASHING_OPTIONS), transformer)
+        else:
+            self._vectorizer = TfidfVectorizer(stop_words="english")
+            self._doc_matrix = self._vectorizer.fit_transform(docs)
         
-    def initialize_knowledge_base(self, financial_docs: List[str]):
-        """Initialize the knowledge base with financial domain documents"""
+        self._indexed_docs = list(docs)
+    
+    def initialize_knowledge_base(self, financial_docs: List[str], n_workers: int = 1):
+        """Initialize the knowledge base with financial domain documents
+        
+        With n_workers > 1 the documents are vectorized in that many worker
+        processes (hashed TF-IDF features), which pays off only for large
+        document sets.
+        """
         self.knowledge_base = financial_docs
+        self._build_index(n_workers)
         print(f"Initialized knowledge base with {len(financial_docs)} documents")
         
     def load_existing_knowledge_base(self):
         """Load existing knowledge base (simplified version)"""
         # In a real implementation, this would load from disk
         self.knowledge_base = FINANCIAL_DOMAIN_DOCS
+        self._build_index()
         print("Loaded existing financial domain knowledge base")
     
+    @staticmethod
+    def embed(texts: List[str], dims: int = 512) -> "np.ndarray":
+        """Hashed bag-of-words embeddings, one L2-normalized row per text
+        
+        Needs no fitted vocabulary, so arbitrary text such as API specs can be
+        compared. Requires NumPy.
+        """
+        vectors = np.zeros((len(texts), dims))
+        for row, text in enumerate(texts):
+            for token in _WORD_RE.findall(text.lower()):
+                vectors[row, zlib.crc32(token.encode()) % dims] += 1.0
+        
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+    
     def generate_domain_aware_tests(self, api_spec: Dict, query_context: str) -> List[Dict]:
         """Generate tests using domain knowledge"""
         api_name = api_spec.get("name", "Unknown API")
@@ -35,41 +156,16 @@ class FinancialRAGEngine:
         relevant_docs = self._find_relevant_knowledge(query_context)
         
         # Generate test scenarios based on knowledge
-        scenarios = []
-        
-        if "banking" in api_type.lower() or "transaction" in api_type.lower():
-            scenarios.extend([
-                {
-                    "name": f"{api_name} AML Compliance Test",
-                    "description": "Test anti-money laundering transaction monitoring",
-                    "priority": "high",
-                    "type": "compliance"
-                },
-                {
-                    "name": f"{api_name} Transaction Integrity Test", 
-                    "description": "Verify transaction authorization and limits",
-                    "priority": "high",
-                    "type": "functional"
-                }
-            ])
-        
-        if "payment" in api_type.lower() or "card" in api_type.lower():
-            scenarios.extend([
-                {
-                    "name": f"{api_name} PCI DSS Compliance Test",
-                    "description": "Test credit card data encryption and protection",
-                    "priority": "high",
-                    "type": "security"
-                }
-            ])
+        api_type_lower = api_type.lower()
+        scenarios = [
+            dict(template, name=template["name"].format(api_name=api_name))
+            for keywords, templates in _SCENARIO_RULES
+            if any(keyword in api_type_lower for keyword in keywords)
+            for template in templates
+        ]
         
         # Add GDPR scenarios for all financial APIs
-        scenarios.append({
-            "name": f"{api_name} GDPR Data Privacy Test",
-            "description": "Test personal data protection and user rights",
-            "priority": "medium", 
-            "type": "compliance"
-        })
+        scenarios.append(dict(_GDPR_SCENARIO, name=_GDPR_SCENARIO["name"].format(api_name=api_name)))
         
         return scenarios
     
@@ -109,19 +205,37 @@ class FinancialRAGEngine:
             
         return requirements
     
-    def _find_relevant_knowledge(self, query: str) -> List[str]:
+    def _find_relevant_knowledge(self, query: str, top_k: int = 3) -> List[str]:
         """Find relevant knowledge documents based on query"""
-        relevant = []
-        query_lower = query.lower()
-        
-        for doc in self.knowledge_base:
-            # Simple keyword matching
-            if any(keyword in doc.lower() for keyword in 
-                   ["pci", "aml", "gdpr", "transaction", "compliance", "security"]):
-                if any(word in doc.lower() for word in query_lower.split()):
-                    relevant.append(doc)
+        if self._vectorizer is not None:
+            relevant = self._rank_by_tfidf(query, top_k)
+        else:
+            relevant = self._match_keywords(query)
         
         return relevant if relevant else self.knowledge_base[:2]  # Return first 2 as fallback
+    
+    def _rank_by_tfidf(self, query: str, top_k: int) -> List[str]:
+        """Score every document against the query with one sparse product"""
+        query_vector = self._vectorizer.transform([query])
+        scores = (self._doc_matrix @ query_vector.T).toarray().ravel()
+        
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        
+        return [self.knowledge_base[i] for i in top if scores[i] > 0]
+    
+    def _match_keywords(self, query: str) -> List[str]:
+        """Keyword fallback when scikit-learn is not installed"""
+        query_tokens = frozenset(_WORD_RE.findall(query.lower()))
+        
+        # Simple keyword matching
+        relevant = [
+            doc for doc, tokens in zip(self.knowledge_base, self._doc_tokens)
+            if tokens & _COMPLIANCE_KEYWORDS and tokens & query_tokens
+        ]
+        
+        return relevant
 
 # Financial domain knowledge for initialization
 FINANCIAL_DOMAIN_DOCS = [
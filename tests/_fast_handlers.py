@@ -0,0 +1,170 @@
+"""
+Typed API handlers for the test runner
+
+Kept free of runner state so the module can be compiled ahead of time
+with mypyc, from the repository root:
+
+    python -m mypyc --explicit-package-bases tests/_fast_handlers.py
+
+The pure-Python module is used as-is when no compiled build is present.
+"""
+import asyncio
+import re
+import threading
+import time
+import types
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, Pattern, Tuple
+
+from api_clients.financial_apis import AlphaVantageClient, MockBankingAPI, CurrencyExchangeClient
+
+class ResponseCache:
+    """LRU memo with a TTL for idempotent API calls within a run
+    
+    Entries hold the call's task, so concurrent callers with the same key
+    share one in-flight request instead of each missing. Call clear() at the
+    start of each run.
+    """
+    
+    def __init__(self, max_size: int = 256, ttl: float = 60.0, enabled: bool = True):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, Tuple[float, asyncio.Future[Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def clear(self):
+        """Forget every stored result"""
+        with self._lock:
+            self._entries.clear()
+    
+    async def get_or_call(self, key: Hashable, fn: Callable[[], Awaitable[Any]],
+                          keep: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, bool]:
+        """Return (result, hit) for key, awaiting fn() only on a miss or expiry
+        
+        hit is False only for the caller that actually ran fn(); callers that
+        joined an in-flight call or found a stored result get True. Results
+        that raise, or for which keep(result) is false, are not stored. Keys
+        that aren't hashable bypass the cache.
+        """
+        try:
+            hash(key)
+        except TypeError:
+            return await fn(), False
+        
+        if not self.enabled:
+            return await fn(), False
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not entry[1].cancelled() and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                task, hit = entry[1], True
+            else:
+                task, hit = asyncio.ensure_future(fn()), False
+                self._entries[key] = (time.monotonic(), task)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        
+        try:
+            # shield: one cancelled caller must not cancel the call others are awaiting
+            value = task.result() if task.done() else await asyncio.shield(task)
+        except Exception:
+            self._discard(key, task)
+            raise
+        
+        if keep is not None and not keep(value):
+            self._discard(key, task)
+        return value, hit
+    
+    def _discard(self, key: Hashable, task: "asyncio.Future[Any]"):
+        """Drop a failed call's entry so the next caller retries"""
+        with self._lock:
+            if key in self._entries and self._entries[key][1] is task:
+                del self._entries[key]
+
+# Shared read-only stand-in for test cases without test_data
+_EMPTY_DICT: Mapping[str, Any] = types.MappingProxyType({})
+
+# Parameter values used when a test case's test_data omits them
+_DEFAULTS: Dict[str, Any] = {
+    "symbol": "AAPL",
+    "account_id": "ACC001",
+    "from_account": "ACC001",
+    "to_account": "ACC002",
+    "amount": 100.0,
+    "from_currency": "USD",
+    "to_currency": "EUR"
+}
+
+def _succeeded(response: Any) -> bool:
+    """Only successful API responses are worth reusing"""
+    return response.success
+
+def _api_result(label: str, response: Any, cached: bool) -> Dict[str, Any]:
+    """Handler result for a cacheable call; hits report no latency of their own"""
+    return {
+        "status": "passed" if response.success else "failed",
+        "message": f"{label} API response: {response.status_code}" + (" (cached)" if cached else ""),
+        "response_time": 0 if cached else response.response_time,
+        "cached": cached
+    }
+
+# Balance and transfer handlers bypass the cache: they read or mutate per-run account state
+async def _handle_stock_price(client: AlphaVantageClient, td: Mapping[str, Any], cache: ResponseCache) -> Dict[str, Any]:
+    symbol = td.get("symbol", _DEFAULTS["symbol"])
+    response, hit = await cache.get_or_call(("stock_api", "get_stock_price", symbol),
+                                            lambda: client.aget_stock_price(symbol), keep=_succeeded)
+    
+    return _api_result("Stock price", response, hit)
+
+async def _handle_balance(client: MockBankingAPI, td: Mapping[str, Any], cache: ResponseCache) -> Dict[str, Any]:
+    account_id = td.get("account_id", _DEFAULTS["account_id"])
+    response = await client.aget_account_balance(account_id)
+    
+    return {
+        "status": "passed" if response.success else "failed",
+        "message": f"Balance API response: {response.status_code}",
+        "response_time": response.response_time
+    }
+
+async def _handle_transfer(client: MockBankingAPI, td: Mapping[str, Any], cache: ResponseCache) -> Dict[str, Any]:
+    from_acc = td.get("from_account", _DEFAULTS["from_account"])
+    to_acc = td.get("to_account", _DEFAULTS["to_account"])
+    amount = td.get("amount", _DEFAULTS["amount"])
+    
+    response = await client.atransfer_funds(from_acc, to_acc, amount)
+    
+    return {
+        "status": "passed" if response.success else "failed",
+        "message": f"Transfer API response: {response.status_code}",
+        "response_time": response.response_time
+    }
+
+async def _handle_exchange_rate(client: CurrencyExchangeClient, td: Mapping[str, Any], cache: ResponseCache) -> Dict[str, Any]:
+    from_curr = td.get("from_currency", _DEFAULTS["from_currency"])
+    to_curr = td.get("to_currency", _DEFAULTS["to_currency"])
+    
+    response, hit = await cache.get_or_call(("currency_api", "exchange_rate", from_curr, to_curr),
+                                            lambda: client.aget_exchange_rate(from_curr, to_curr),
+                                            keep=_succeeded)
+    
+    return _api_result("Exchange rate", response, hit)
+
+Handler = Callable[[Any, Mapping[str, Any], ResponseCache], Awaitable[Dict[str, Any]]]
+
+# (api_type, verb) -> handler; the verb is the first keyword found in the test case name,
+# matched case-insensitively so names never need lowercasing
+_HANDLERS: Dict[Tuple[str, str], Handler] = {
+    ("stock_api", "get_stock_price"): _handle_stock_price,
+    ("banking_api", "balance"): _handle_balance,
+    ("banking_api", "transfer"): _handle_transfer,
+    ("currency_api", "exchange_rate"): _handle_exchange_rate
+}
+
+_VERB_PATTERNS: Dict[str, Pattern[str]] = {
+    api_type: re.compile("|".join(verb for handler_type, verb in _HANDLERS if handler_type == api_type),
+                         re.IGNORECASE)
+    for api_type, _ in _HANDLERS
+}
@@ -0,0 +1,81 @@
+"""
+Tests for the persistent AI artifact caches
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+np = pytest.importorskip("numpy")
+
+from core.ai_engine import AITestEngine
+from core.cache import SemanticCache
+from core.rag_engine import FinancialRAGEngine
+
+CONTEXT = "Financial application testing with focus on security and compliance"
+
+BANKING_SPEC = {
+    "name": "Banking API",
+    "type": "banking_api",
+    "description": "Core banking operations API",
+    "endpoints": ["/balance", "/transfer", "/history"],
+    "authentication": "OAuth 2.0"
+}
+
+CURRENCY_SPEC = {
+    "name": "Currency Exchange API",
+    "type": "currency_api",
+    "description": "Real-time currency exchange rates",
+    "endpoints": ["/latest", "/convert"],
+    "authentication": "API Key"
+}
+
+def _semantic_key(spec):
+    # (text, api type) exactly as the engine looks specs up
+    return AITestEngine(cache_dir=None)._test_case_keys(spec, CONTEXT)[2]
+
+@pytest.fixture
+def cache(tmp_path):
+    return SemanticCache(str(tmp_path / "semantic_cache.json"), FinancialRAGEngine.embed)
+
+def test_semantic_cache_hits_spec_with_one_changed_word(cache):
+    text, api_type = _semantic_key(BANKING_SPEC)
+    cache.set(text, ["cached"], api_type)
+    
+    near_duplicate = dict(BANKING_SPEC, description="Core banking operations service")
+    
+    assert cache.get(*_semantic_key(near_duplicate)) == ["cached"]
+
+def test_semantic_cache_misses_unrelated_spec(cache):
+    text, api_type = _semantic_key(BANKING_SPEC)
+    cache.set(text, ["cached"], api_type)
+    
+    unrelated = {
+        "name": "Weather Forecast Feed",
+        "type": "weather_feed",
+        "description": "Hourly precipitation and wind outlooks for coastal regions",
+        "endpoints": ["/forecast", "/radar"],
+        "authentication": "None"
+    }
+    
+    assert cache.get(*_semantic_key(unrelated)) is None
+
+def test_semantic_cache_never_crosses_api_types(cache):
+    text, api_type = _semantic_key(CURRENCY_SPEC)
+    cache.set(text, ["currency cases"], api_type)
+    
+    retyped = dict(CURRENCY_SPEC, type="stock_api")
+    
+    assert cache.get(*_semantic_key(retyped)) is None
+    assert cache.get(*_semantic_key(CURRENCY_SPEC)) == ["currency cases"]
+
+def test_semantic_cache_persists_entries(tmp_path):
+    path = str(tmp_path / "semantic_cache.json")
+    text, api_type = _semantic_key(BANKING_SPEC)
+    SemanticCache(path, FinancialRAGEngine.embed).set(text, ["cached"], api_type)
+    
+    reloaded = SemanticCache(path, FinancialRAGEngine.embed)
+    
+    assert reloaded.get_many([text, "unrelated text"], [api_type, api_type]) == [["cached"], None]
@@ -0,0 +1,78 @@
+"""
+Tests for the runner's in-run API response cache
+"""
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from api_clients.financial_apis import APIResponse
+from tests._fast_handlers import ResponseCache, _handle_stock_price
+
+class CountingStockClient:
+    """Stock client double that records calls and returns a fixed outcome"""
+    
+    def __init__(self, success: bool = True):
+        self.success = success
+        self.calls = []
+    
+    async def aget_stock_price(self, symbol):
+        self.calls.append(symbol)
+        await asyncio.sleep(0.01)
+        return APIResponse(
+            status_code=200 if self.success else 500,
+            data={},
+            headers={},
+            response_time_ns=1000,
+            success=self.success
+        )
+
+def test_concurrent_identical_calls_share_one_request():
+    client = CountingStockClient()
+    cache = ResponseCache()
+    
+    async def run():
+        return await asyncio.gather(*(_handle_stock_price(client, {"symbol": "AAPL"}, cache) for _ in range(10)))
+    
+    results = asyncio.run(run())
+    
+    assert client.calls == ["AAPL"]
+    assert [r["cached"] for r in results] == [False] + [True] * 9
+    assert all(r["response_time"] == 0 for r in results[1:])
+
+def test_failed_responses_are_not_reused():
+    client = CountingStockClient(success=False)
+    cache = ResponseCache()
+    
+    async def run():
+        first = await _handle_stock_price(client, {"symbol": "AAPL"}, cache)
+        second = await _handle_stock_price(client, {"symbol": "AAPL"}, cache)
+        return first, second
+    
+    first, second = asyncio.run(run())
+    
+    assert client.calls == ["AAPL", "AAPL"]
+    assert first["status"] == second["status"] == "failed"
+    assert not second["cached"]
+
+def test_unhashable_params_bypass_the_cache():
+    client = CountingStockClient()
+    cache = ResponseCache()
+    
+    result = asyncio.run(_handle_stock_price(client, {"symbol": ["AAPL", "MSFT"]}, cache))
+    
+    assert client.calls == [["AAPL", "MSFT"]]
+    assert result["status"] == "passed"
+    assert not result["cached"]
+
+def test_clear_forgets_stored_results():
+    client = CountingStockClient()
+    cache = ResponseCache()
+    
+    asyncio.run(_handle_stock_price(client, {"symbol": "AAPL"}, cache))
+    cache.clear()
+    result = asyncio.run(_handle_stock_price(client, {"symbol": "AAPL"}, cache))
+    
+    assert client.calls == ["AAPL", "AAPL"]
+    assert not result["cached"]
@@ -2,57 +2,236 @@
 AI-Enhanced Test Runner with intelligent test execution and analysis
 """
 import pytest
+import asyncio
 import json
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import threading
+import time
+from collections import Counter
+from typing import List, Dict, Any, Iterable, Optional
+from dataclasses import asdict
+from datetime import datetime, timedelta
 import os
 import sys
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from core.ai_engine import AITestEngine, TestCase
+from core.ai_engine import AITestEngine, TestCase, TestResult
 from core.rag_engine import FinancialRAGEngine, FINANCIAL_DOMAIN_DOCS
 from api_clients.financial_apis import AlphaVantageClient, MockBankingAPI, CurrencyExchangeClient
+from tests._fast_handlers import ResponseCache, _EMPTY_DICT, _HANDLERS, _VERB_PATTERNS
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+_CLIENT_FACTORIES = {
+    "stock_api": AlphaVantageClient,
+    "banking_api": MockBankingAPI,
+    "currency_api": CurrencyExchangeClient
+}
+
+# Column codes for result statuses; executed tests (passed/failed) sort first
+_STATUS_CODES = {"passed": 0, "failed": 1, "error": 2, "skipped": 3}
+_OTHER_STATUS = len(_STATUS_CODES)
+
+def _summarize_results(results: List[TestResult]) -> Dict[str, Any]:
+    """Pass/fail counts and, with NumPy, latency percentiles and per-endpoint means"""
+    if not NUMPY_AVAILABLE:
+        status_counts = Counter(r.status for r in results)
+        return {"passed_tests": status_counts["passed"], "failed_tests": status_counts["failed"]}
+    
+    # One pass copies the records into columns; the statistics are then vectorized
+    n = len(results)
+    statuses = np.empty(n, dtype=np.uint8)
+    response_times = np.empty(n, dtype=np.float32)
+    endpoints = np.empty(n, dtype=np.int32)
+    cached = np.empty(n, dtype=np.bool_)
+    endpoint_ids: Dict[Optional[str], int] = {}
+    for i, r in enumerate(results):
+        statuses[i] = _STATUS_CODES.get(r.status, _OTHER_STATUS)
+        response_times[i] = r.response_time
+        endpoints[i] = endpoint_ids.setdefault(r.api_endpoint, len(endpoint_ids))
+        cached[i] = r.cached
+    
+    status_counts = np.bincount(statuses, minlength=_OTHER_STATUS + 1)
+    summary: Dict[str, Any] = {
+        "passed_tests": int(status_counts[_STATUS_CODES["passed"]]),
+        "failed_tests": int(status_counts[_STATUS_CODES["failed"]])
+    }
+    
+    # Latency covers executed tests that made their own call; cache hits have no latency
+    measured = (statuses <= _STATUS_CODES["failed"]) & ~cached
+    if measured.any():
+        measured_times = response_times[measured]
+        p50, p95, p99 = np.quantile(measured_times, [0.5, 0.95, 0.99])
+        totals = np.bincount(endpoints[measured], weights=measured_times, minlength=len(endpoint_ids))
+        hits = np.bincount(endpoints[measured], minlength=len(endpoint_ids))
+        summary["latency_stats"] = {
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "mean_by_endpoint": {
+                endpoint if endpoint is not None else "unknown": float(totals[i] / hits[i])
+                for endpoint, i in endpoint_ids.items() if hits[i]
+            }
+        }
+    
+    return summary
+
+def _dumps(value: Any, indent: bool = False) -> bytes:
+    """Serialize value to UTF-8 JSON bytes, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(value, option=option)
+    return json.dumps(value, indent=2 if indent else None).encode()
+
+def _report_records(results: Dict[str, Any]):
+    """Yield result records as dicts with ts_offset_ns materialized as an ISO timestamp"""
+    started_at = results.get("started_at")
+    t0 = datetime.fromisoformat(started_at) if started_at else None
+    for record in results.get("test_results", []):
+        if isinstance(record, TestResult):
+            record = asdict(record)
+        if t0 is not None and "ts_offset_ns" in record:
+            record = dict(record)
+            record["timestamp"] = (t0 + timedelta(microseconds=record.pop("ts_offset_ns") / 1000)).isoformat()
+        yield record
+
+def _write_report_stream(f, results: Dict[str, Any]):
+    """Write results as one JSON object without serializing test_results in one go"""
+    f.write(b'{"test_results": [')
+    for i, record in enumerate(_report_records(results)):
+        f.write(b",\n  " if i else b"\n  ")
+        f.write(_dumps(record))
+    f.write(b"\n]")
+    for key, value in results.items():
+        if key != "test_results":
+            f.write(b",\n" + _dumps(key) + b": " + _dumps(value, indent=True))
+    f.write(b"\n}\n")
 
 class AITestRunner:
-    def __init__(self):
-        self.ai_engine = AITestEngine()
-        self.rag_engine = FinancialRAGEngine()
+    def __init__(self, max_concurrency: int = 16, cache_responses: bool = True):
+        self.ai_engine = AITestEngine(embedder=FinancialRAGEngine.embed)
+        self._rag_engine: Optional[FinancialRAGEngine] = None
+        self._rag_thread: Optional[threading.Thread] = None
+        self._rag_lock = threading.Lock()
         self.test_results = []
-        self.initialize_rag()
+        self.max_concurrency = max_concurrency
+        self._clients: Dict[str, Any] = {}
+        self._clients_lock = threading.Lock()
+        self.response_cache = ResponseCache(enabled=cache_responses)
     
     def initialize_rag(self):
+        """Start loading the RAG knowledge base in a background thread (idempotent)"""
+        with self._rag_lock:
+            if self._rag_thread is None:
+                self._rag_thread = threading.Thread(target=self._load_rag, daemon=True)
+                self._rag_thread.start()
+    
+    def _load_rag(self):
         """Initialize RAG knowledge base with financial domain knowledge"""
+        rag_engine = FinancialRAGEngine()
         try:
-            self.rag_engine.load_existing_knowledge_base()
+            rag_engine.load_existing_knowledge_base()
         except:
             # If no existing knowledge base, create new one
-            self.rag_engine.initialize_knowledge_base(FINANCIAL_DOMAIN_DOCS)
+            rag_engine.initialize_knowledge_base(FINANCIAL_DOMAIN_DOCS)
+        self._rag_engine = rag_engine
+    
+    @property
+    def rag_engine(self) -> FinancialRAGEngine:
+        """RAG engine, waiting for the background load on first use"""
+        self.initialize_rag()
+        self._rag_thread.join()
+        if self._rag_engine is None:
+            # Background load failed; retry here so the error surfaces to the caller
+            self._load_rag()
+        return self._rag_engine
+    
+    async def _await_rag_engine(self) -> FinancialRAGEngine:
+        """Async form of rag_engine; waits for the background load off the event loop"""
+        self.initialize_rag()
+        await asyncio.to_thread(self._rag_thread.join)
+        if self._rag_engine is None:
+            await asyncio.to_thread(self._load_rag)
+        return self._rag_engine
+    
+    def _get_client(self, api_type: str) -> Any:
+        """Shared client per API type so its connection pool is reused across tests"""
+        with self._clients_lock:
+            client = self._clients.get(api_type)
+            if client is None:
+                client = self._clients[api_type] = _CLIENT_FACTORIES[api_type]()
+            return client
+    
+    async def warm_up(self, api_types: Optional[Iterable[str]] = None):
+        """Create the clients for api_types (default: all) and open their connections"""
+        if api_types is None:
+            api_types = _CLIENT_FACTORIES
+        await asyncio.gather(*(
+            self._get_client(api_type).aping() for api_type in set(api_types) if api_type in _CLIENT_FACTORIES
+        ))
     
     def run_ai_generated_tests(self, api_specs: List[Dict]) -> Dict[str, Any]:
         """Run AI-generated tests for given API specifications"""
-        all_results = []
+        return asyncio.run(self.arun_ai_generated_tests(api_specs))
+    
+    async def arun_ai_generated_tests(self, api_specs: List[Dict]) -> Dict[str, Any]:
+        """Async variant of run_ai_generated_tests for use on an event loop"""
+        # Responses are shared between tests of this run only
+        self.response_cache.clear()
+        
+        # Load domain knowledge while the AI engine generates test cases
+        self.initialize_rag()
         
         for api_spec in api_specs:
             print(f"Generating tests for API: {api_spec.get('name', 'Unknown')}")
-            
-            # Generate test cases using AI
-            test_cases = self.ai_engine.generate_test_cases(
-                api_spec, 
+        
+        # Open connections for the APIs under test while the AI engine generates test cases;
+        # tests don't wait for this, a request that beats the ping just opens its own connection
+        warm_up = asyncio.create_task(self.warm_up({spec.get("type") for spec in api_specs}))
+        try:
+            # Generate test cases for every spec in one batch
+            batched_test_cases = await self.ai_engine.generate_test_cases_batch(
+                api_specs,
                 context="Financial application testing with focus on security and compliance"
             )
             
-            # Get RAG-enhanced test scenarios
-            rag_scenarios = self.rag_engine.generate_domain_aware_tests(
-                api_spec, 
-                "Banking and financial services"
-            )
+            rag_engine = await self._await_rag_engine()
+            pending = []
+            for api_spec, test_cases in zip(api_specs, batched_test_cases):
+                # Get RAG-enhanced test scenarios
+                rag_scenarios = rag_engine.generate_domain_aware_tests(
+                    api_spec, 
+                    "Banking and financial services"
+                )
+                
+                pending.extend((test_case, api_spec) for test_case in test_cases)
             
-            # Execute tests
-            for test_case in test_cases:
-                result = self._execute_test_case(test_case, api_spec)
-                all_results.append(result)
+            # Execute tests concurrently on this event loop; each one is an API round trip
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            # Records carry a monotonic offset from this instant rather than a wall-clock string
+            started_at = datetime.now().isoformat()
+            t0_ns = time.monotonic_ns()
+            all_results = list(await asyncio.gather(
+                *(self._execute_test_case(test_case, api_spec, semaphore, t0_ns) for test_case, api_spec in pending)
+            ))
+        finally:
+            warm_up.cancel()
+            await asyncio.gather(warm_up, return_exceptions=True)
+            # Async connection pools belong to this loop, so release them before it ends
+            for client in list(self._clients.values()):
+                if hasattr(client, "aclose"):
+                    await client.aclose()
         
         # AI analysis of results
         analysis = self.ai_engine.analyze_test_results(all_results)
@@ -61,114 +240,80 @@ class AITestRunner:
             "test_results": all_results,
             "ai_analysis": analysis,
             "total_tests": len(all_results),
-            "passed_tests": len([r for r in all_results if r["status"] == "passed"]),
-            "failed_tests": len([r for r in all_results if r["status"] == "failed"]),
+            **_summarize_results(all_results),
+            "started_at": started_at,
             "timestamp": datetime.now().isoformat()
         }
     
-    def _execute_test_case(self, test_case: TestCase, api_spec: Dict) -> Dict[str, Any]:
-        """Execute a single test case"""
+    async def _execute_test_case(self, test_case: TestCase, api_spec: Dict,
+                                 semaphore: asyncio.Semaphore, t0_ns: int) -> TestResult:
+        """Execute a single test case
+        
+        ts_offset_ns is the completion time in nanoseconds after t0_ns;
+        generate_test_report turns it back into an ISO timestamp.
+        """
         try:
             # Determine which API client to use based on spec
             api_type = api_spec.get("type", "unknown")
             
-            if api_type == "stock_api":
-                client = AlphaVantageClient()
-                result = self._test_stock_api(client, test_case)
-            elif api_type == "banking_api":
-                client = MockBankingAPI()
-                result = self._test_banking_api(client, test_case)
-            elif api_type == "currency_api":
-                client = CurrencyExchangeClient()
-                result = self._test_currency_api(client, test_case)
+            td = test_case.test_data or _EMPTY_DICT
+            
+            if api_type in _VERB_PATTERNS:
+                verb = _VERB_PATTERNS[api_type].search(test_case.name)
+                if verb:
+                    async with semaphore:
+                        result = await _HANDLERS[(api_type, verb.group(0).lower())](
+                            self._get_client(api_type), td, self.response_cache
+                        )
+                else:
+                    result = {"status": "skipped", "message": "Test not implemented"}
             else:
                 result = {
                     "status": "skipped",
                     "message": f"Unknown API type: {api_type}"
                 }
             
-            return {
-                "test_name": test_case.name,
-                "test_type": test_case.test_type,
-                "priority": test_case.priority,
-                "api_endpoint": test_case.api_endpoint,
-                "status": result["status"],
-                "message": result.get("message", ""),
-                "response_time": result.get("response_time", 0),
-                "timestamp": datetime.now().isoformat()
-            }
+            return TestResult(
+                test_name=test_case.name,
+                test_type=test_case.test_type,
+                priority=test_case.priority,
+                api_endpoint=test_case.api_endpoint,
+                status=result["status"],
+                message=result.get("message", ""),
+                response_time=result.get("response_time", 0),
+                cached=result.get("cached", False),
+                ts_offset_ns=time.monotonic_ns() - t0_ns
+            )
         
         except Exception as e:
-            return {
-                "test_name": test_case.name,
-                "test_type": test_case.test_type,
-                "priority": test_case.priority,
-                "status": "error",
-                "message": str(e),
-                "timestamp": datetime.now().isoformat()
-            }
-    
-    def _test_stock_api(self, client: AlphaVantageClient, test_case: TestCase) -> Dict:
-        """Test stock API endpoints"""
-        if "get_stock_price" in test_case.name.lower():
-            symbol = test_case.test_data.get("symbol", "AAPL") if test_case.test_data else "AAPL"
-            response = client.get_stock_price(symbol)
-            
-            return {
-                "status": "passed" if response.success else "failed",
-                "message": f"Stock price API response: {response.status_code}",
-                "response_time": response.response_time
-            }
-        
-        return {"status": "skipped", "message": "Test not implemented"}
-    
-    def _test_banking_api(self, client: MockBankingAPI, test_case: TestCase) -> Dict:
-        """Test banking API endpoints"""
-        if "balance" in test_case.name.lower():
-            account_id = test_case.test_data.get("account_id", "ACC001") if test_case.test_data else "ACC001"
-            response = client.get_account_balance(account_id)
-            
-            return {
-                "status": "passed" if response.success else "failed",
-                "message": f"Balance API response: {response.status_code}",
-                "response_time": response.response_time
-            }
-        
-        elif "transfer" in test_case.name.lower():
-            from_acc = test_case.test_data.get("from_account", "ACC001") if test_case.test_data else "ACC001"
-            to_acc = test_case.test_data.get("to_account", "ACC002") if test_case.test_data else "ACC002"
-            amount = test_case.test_data.get("amount", 100.0) if test_case.test_data else 100.0
-            
-            response = client.transfer_funds(from_acc, to_acc, amount)
-            
-            return {
-                "status": "passed" if response.success else "failed",
-                "message": f"Transfer API response: {response.status_code}",
-                "response_time": response.response_time
-            }
-        
-        return {"status": "skipped", "message": "Test not implemented"}
+            return TestResult(
+                test_name=test_case.name,
+                test_type=test_case.test_type,
+                priority=test_case.priority,
+                status="error",
+                message=str(e),
+                ts_offset_ns=time.monotonic_ns() - t0_ns
+            )
     
-    def _test_currency_api(self, client: CurrencyExchangeClient, test_case: TestCase) -> Dict:
-        """Test currency exchange API"""
-        if "exchange_rate" in test_case.name.lower():
-            from_curr = test_case.test_data.get("from_currency", "USD") if test_case.test_data else "USD"
-            to_curr = test_case.test_data.get("to_currency", "EUR") if test_case.test_data else "EUR"
-            
-            response = client.get_exchange_rate(from_curr, to_curr)
-            
-            return {
-                "status": "passed" if response.success else "failed",
-                "message": f"Exchange rate API response: {response.status_code}",
-                "response_time": response.response_time
-            }
+    def generate_test_report(self, results: Dict[str, Any], output_file: str = "test_report.json",
+                             split: bool = False):
+        """Generate comprehensive test report with AI insights
         
-        return {"status": "skipped", "message": "Test not implemented"}
-    
-    def generate_test_report(self, results: Dict[str, Any], output_file: str = "test_report.json"):
-        """Generate comprehensive test report with AI insights"""
-        with open(output_file, 'w') as f:
-            json.dump(results, f, indent=2)
+        The report is written one result record at a time. With split=True the
+        summary goes to <name>.summary.json and the records to <name>.results.jsonl.
+        """
+        if split:
+            stem = os.path.splitext(output_file)[0]
+            with open(f"{stem}.summary.json", 'wb') as f:
+                f.write(_dumps({k: v for k, v in results.items() if k != "test_results"}, indent=True))
+            with open(f"{stem}.results.jsonl", 'wb') as f:
+                for record in _report_records(results):
+                    f.write(_dumps(record))
+                    f.write(b"\n")
+            output_file = f"{stem}.results.jsonl"
+        else:
+            with open(output_file, 'wb') as f:
+                _write_report_stream(f, results)
         
         print(f"\n=== AI-Enhanced Test Report ===")
         print(f"Total Tests: {results['total_tests']}")
@@ -209,5 +354,5 @@ SAMPLE_API_SPECS = [
 
 if __name__ == "__main__":
     runner = AITestRunner()
-    results = runner.run_ai_generated_tests(SAMPLE_API_SPECS)
+    results = asyncio.run(runner.arun_ai_generated_tests(SAMPLE_API_SPECS))
     runner.generate_test_report(results)
\ No newline at end of file